@@ -1,7 +1,13 @@
+from hmac import compare_digest
+from typing import Iterable, Optional, Tuple
+
+import orjson
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from fastapi.security.utils import get_authorization_scheme_param
+from starlette.types import ASGIApp, Receive, Scope, Send
 
-from app.config import settings
+from app.config import get_settings
 
 security = HTTPBearer()
 
@@ -10,9 +16,64 @@ async def verify_token(
     credentials: HTTPAuthorizationCredentials = Depends(security),
 ) -> str:
     """Verify the Bearer token matches the configured JAKETODO_API_TOKEN."""
-    if credentials.credentials != settings.jaketodo_api_token:
+    # Called directly rather than via Depends: a sync dependency would cost a
+    # threadpool hop per request, and get_settings() is a cached lookup anyway
+    expected = get_settings().token_bytes
+    if not compare_digest(credentials.credentials.encode("utf-8"), expected):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication token",
         )
     return credentials.credentials
+
+
+def _check_authorization(header: Optional[str]) -> Optional[Tuple[int, str]]:
+    """Mirror HTTPBearer + verify_token; return (status, detail) on failure, else None."""
+    scheme, credentials = get_authorization_scheme_param(header)
+    if not (header and scheme and credentials):
+        return status.HTTP_403_FORBIDDEN, "Not authenticated"
+    if scheme.lower() != "bearer":
+        return status.HTTP_403_FORBIDDEN, "Invalid authentication credentials"
+    if not compare_digest(credentials.encode("utf-8"), get_settings().token_bytes):
+        return status.HTTP_401_UNAUTHORIZED, "Invalid authentication token"
+    return None
+
+
+class BearerAuthMiddleware:
+    """Reject requests under `prefixes` with a bad or missing token before the body is read.
+
+    FastAPI parses and validates the request body before running any dependency,
+    so verify_token alone lets malformed bodies from unauthenticated clients
+    through to a 422. The routers keep verify_token for the OpenAPI schema.
+    """
+
+    def __init__(self, app: ASGIApp, prefixes: Iterable[str]):
+        self.app = app
+        self.prefixes = tuple(prefixes)
+
+    def _protects(self, path: str) -> bool:
+        return any(path == prefix or path.startswith(prefix + "/") for prefix in self.prefixes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._protects(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        header = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                header = value.decode("latin-1")
+                break
+        failure = _check_authorization(header)
+        if failure is None:
+            await self.app(scope, receive, send)
+            return
+
+        status_code, detail = failure
+        body = orjson.dumps({"detail": detail})
+        headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ]
+        await send({"type": "http.response.start", "status": status_code, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
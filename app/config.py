@@ -1,3 +1,5 @@
+from functools import cached_property, lru_cache
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -7,5 +9,13 @@ class Settings(BaseSettings):
     jaketodo_api_token: str
     database_path: str = "./data/todos.db"
 
+    @cached_property
+    def token_bytes(self) -> bytes:
+        """The API token encoded once for constant-time comparison."""
+        return self.jaketodo_api_token.encode("utf-8")
+
 
-settings = Settings()
+@lru_cache
+def get_settings() -> Settings:
+    """Build Settings (reading the environment and .env) once per process."""
+    return Settings()
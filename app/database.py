@@ -1,58 +1,146 @@
-from typing import Optional
+import asyncio
+import os
+from typing import AsyncIterator, List, Optional
 
 import aiosqlite
 from contextlib import asynccontextmanager
+from fastapi import Request
 from pathlib import Path
 
-from app.config import settings
+from app.config import get_settings
 
-DATABASE_PATH = settings.database_path
+# journal_mode persists in the database file; the rest are per-connection
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA foreign_keys=ON",
+)
+
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS todos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    description TEXT NOT NULL,
+    due_date_text TEXT,
+    due_date DATE,
+    notes TEXT,
+    priority INTEGER NOT NULL DEFAULT 3 CHECK (priority BETWEEN 1 AND 4),
+    status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'completed')),
+    gcal_event_id TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    completed_at TIMESTAMP,
+    deleted_at TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_todos_status_deleted ON todos(status, deleted_at);
+CREATE INDEX IF NOT EXISTS idx_todos_priority ON todos(priority);
+-- Partial index over live rows that covers the list predicate and sort order
+CREATE INDEX IF NOT EXISTS idx_todos_live_sort
+    ON todos(deleted_at, due_date, priority) WHERE deleted_at IS NULL;
+DROP INDEX IF EXISTS idx_todos_due_date;
+"""
+
+
+def _is_uri(path: str) -> bool:
+    """Whether `path` is an SQLite URI filename, e.g. file:name?mode=memory&cache=shared."""
+    return path.startswith("file:")
+
+
+async def _apply_pragmas(db: aiosqlite.Connection) -> None:
+    """Apply the performance PRAGMAs to a freshly opened connection."""
+    for pragma in PRAGMAS:
+        await db.execute(pragma)
 
 
 async def init_db(db_path: Optional[str] = None) -> None:
     """Initialize the database with the todos table and indexes."""
-    path = db_path or DATABASE_PATH
+    path = db_path or get_settings().database_path
 
     # Ensure directory exists for file-based databases
-    if path != ":memory:":
+    if path != ":memory:" and not _is_uri(path):
         Path(path).parent.mkdir(parents=True, exist_ok=True)
 
-    async with aiosqlite.connect(path) as db:
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS todos (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                description TEXT NOT NULL,
-                due_date_text TEXT,
-                due_date DATE,
-                notes TEXT,
-                priority INTEGER NOT NULL DEFAULT 3 CHECK (priority BETWEEN 1 AND 4),
-                status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'completed')),
-                gcal_event_id TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                completed_at TIMESTAMP,
-                deleted_at TIMESTAMP
-            )
-        """)
-        await db.execute(
-            "CREATE INDEX IF NOT EXISTS idx_todos_status_deleted ON todos(status, deleted_at)"
-        )
-        await db.execute(
-            "CREATE INDEX IF NOT EXISTS idx_todos_priority ON todos(priority)"
-        )
-        await db.execute(
-            "CREATE INDEX IF NOT EXISTS idx_todos_due_date ON todos(due_date)"
-        )
+    async with aiosqlite.connect(path, uri=_is_uri(path)) as db:
+        await _apply_pragmas(db)
+        await db.executescript(SCHEMA_SQL)
         await db.commit()
 
 
-@asynccontextmanager
-async def get_db(db_path: Optional[str] = None):
-    """Async context manager for database connections."""
-    path = db_path or DATABASE_PATH
-    db = await aiosqlite.connect(path)
+async def connect_db(db_path: Optional[str] = None, **kwargs) -> aiosqlite.Connection:
+    """Open a connection with PRAGMAs applied that returns rows as aiosqlite.Row."""
+    path = db_path or get_settings().database_path
+    db = await aiosqlite.connect(path, uri=_is_uri(path), **kwargs)
     db.row_factory = aiosqlite.Row
-    try:
+    await _apply_pragmas(db)
+    return db
+
+
+class ConnectionPool:
+    """One shared writer connection plus a queue of reader connections."""
+
+    def __init__(self, writer: aiosqlite.Connection, readers: List[aiosqlite.Connection]):
+        self.writer = writer
+        # Held for a whole request so one request's transaction never interleaves with another's
+        self.write_lock = asyncio.Lock()
+        self._readers = list(readers)
+        self.readers: asyncio.Queue = asyncio.Queue()
+        for reader in self._readers:
+            self.readers.put_nowait(reader)
+
+    @classmethod
+    async def open(
+        cls, db_path: Optional[str] = None, size: Optional[int] = None
+    ) -> "ConnectionPool":
+        """Open the writer and `size` readers (defaults to the CPU count)."""
+        path = db_path or get_settings().database_path
+        # BEGIN IMMEDIATE takes the write lock up front instead of upgrading later
+        writer = await connect_db(path, isolation_level="IMMEDIATE")
+        # Each :memory: connection is its own database, so readers can't share it
+        if path == ":memory:":
+            size = 0
+        elif size is None:
+            size = os.cpu_count() or 1
+        readers = [await connect_db(path) for _ in range(size)]
+        return cls(writer, readers)
+
+    @asynccontextmanager
+    async def reader(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Check out a reader connection, falling back to the writer if there are none."""
+        if not self._readers:
+            yield self.writer
+            return
+        db = await self.readers.get()
+        try:
+            yield db
+        finally:
+            self.readers.put_nowait(db)
+
+    async def close(self) -> None:
+        """Close every connection in the pool."""
+        for db in (self.writer, *self._readers):
+            await db.close()
+
+
+async def get_reader_db(request: Request) -> AsyncIterator[aiosqlite.Connection]:
+    """FastAPI dependency lending a reader connection for the request."""
+    async with request.app.state.pool.reader() as db:
         yield db
-    finally:
-        await db.close()
+
+
+async def get_writer_db(request: Request) -> AsyncIterator[aiosqlite.Connection]:
+    """FastAPI dependency lending the shared writer connection for the request.
+
+    Requests take turns on the writer, and a request that fails mid-transaction
+    is rolled back so it doesn't keep holding SQLite's write lock.
+    """
+    pool = request.app.state.pool
+    async with pool.write_lock:
+        try:
+            yield pool.writer
+        except Exception:
+            await pool.writer.rollback()
+            raise
@@ -1,9 +1,11 @@
-from typing import Optional
+from typing import List, Optional
 
+import aiosqlite
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
 
 from app.auth import verify_token
-from app.database import get_db
+from app.database import get_reader_db, get_writer_db
 from app.models.todo import (
     TodoBulkCreateRequest,
     TodoBulkCreateResponse,
@@ -15,96 +17,109 @@ from app.models.todo import (
 )
 from app.services import todo_service
 
-router = APIRouter()
+router = APIRouter(dependencies=[Depends(verify_token)])
+
+
+def _todos_response(
+    todos: List[TodoResponse], status_code: int = status.HTTP_200_OK
+) -> ORJSONResponse:
+    """Encode a todos/count payload with orjson, skipping response_model re-validation.
+
+    The service already returns well-formed TodoResponse objects; response_model
+    stays on the route for the OpenAPI schema. get_todo does the same for one TODO.
+    """
+    return ORJSONResponse(
+        {"todos": [todo.model_dump() for todo in todos], "count": len(todos)},
+        status_code=status_code,
+    )
 
 
 @router.post("", response_model=TodoResponse, status_code=status.HTTP_201_CREATED)
-async def create_todo(data: TodoCreate, _: str = Depends(verify_token)):
+async def create_todo(data: TodoCreate, db: aiosqlite.Connection = Depends(get_writer_db)):
     """Create a new TODO."""
-    async with get_db() as db:
-        return await todo_service.create_todo(db, data)
+    return await todo_service.create_todo(db, data)
 
 
 @router.post("/bulk", response_model=TodoBulkCreateResponse, status_code=status.HTTP_201_CREATED)
-async def bulk_create_todos(data: TodoBulkCreateRequest, _: str = Depends(verify_token)):
+async def bulk_create_todos(
+    data: TodoBulkCreateRequest,
+    db: aiosqlite.Connection = Depends(get_writer_db),
+):
     """Create multiple TODOs at once."""
-    async with get_db() as db:
-        todos = await todo_service.bulk_create_todos(db, data.todos)
-        return TodoBulkCreateResponse(todos=todos, count=len(todos))
+    todos = await todo_service.bulk_create_todos(db, data.todos)
+    return _todos_response(todos, status_code=status.HTTP_201_CREATED)
 
 
 @router.get("", response_model=TodoListResponse)
 async def list_todos(
     status_filter: Optional[str] = Query(None, alias="status"),
     priority: Optional[int] = Query(None, ge=1, le=4),
-    _: str = Depends(verify_token),
+    db: aiosqlite.Connection = Depends(get_reader_db),
 ):
     """List all TODOs with optional filters."""
-    async with get_db() as db:
-        todos = await todo_service.list_todos(db, status=status_filter, priority=priority)
-        return TodoListResponse(todos=todos, count=len(todos))
+    todos = await todo_service.list_todos(db, status=status_filter, priority=priority)
+    return _todos_response(todos)
 
 
 @router.get("/{todo_id}", response_model=TodoResponse)
-async def get_todo(todo_id: int, _: str = Depends(verify_token)):
+async def get_todo(todo_id: int, db: aiosqlite.Connection = Depends(get_reader_db)):
     """Get a single TODO by ID."""
-    async with get_db() as db:
-        todo = await todo_service.get_todo(db, todo_id)
-        if todo is None:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="TODO not found",
-            )
-        return todo
+    todo = await todo_service.get_todo(db, todo_id)
+    if todo is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="TODO not found",
+        )
+    return ORJSONResponse(todo.model_dump())
 
 
 @router.put("/{todo_id}", response_model=TodoResponse)
-async def update_todo(todo_id: int, data: TodoUpdate, _: str = Depends(verify_token)):
+async def update_todo(
+    todo_id: int,
+    data: TodoUpdate,
+    db: aiosqlite.Connection = Depends(get_writer_db),
+):
     """Update a TODO."""
-    async with get_db() as db:
-        todo = await todo_service.update_todo(db, todo_id, data)
-        if todo is None:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="TODO not found",
-            )
-        return todo
+    todo = await todo_service.update_todo(db, todo_id, data)
+    if todo is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="TODO not found",
+        )
+    return todo
 
 
 @router.delete("/{todo_id}", response_model=TodoDeleteResponse)
-async def delete_todo(todo_id: int, _: str = Depends(verify_token)):
+async def delete_todo(todo_id: int, db: aiosqlite.Connection = Depends(get_writer_db)):
     """Soft delete a TODO."""
-    async with get_db() as db:
-        deleted = await todo_service.delete_todo(db, todo_id)
-        if not deleted:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="TODO not found",
-            )
-        return TodoDeleteResponse(message="TODO deleted", id=todo_id)
+    deleted = await todo_service.delete_todo(db, todo_id)
+    if not deleted:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="TODO not found",
+        )
+    return TodoDeleteResponse(message="TODO deleted", id=todo_id)
 
 
 @router.post("/{todo_id}/complete", response_model=TodoResponse)
-async def complete_todo(todo_id: int, _: str = Depends(verify_token)):
+async def complete_todo(todo_id: int, db: aiosqlite.Connection = Depends(get_writer_db)):
     """Mark a TODO as completed."""
-    async with get_db() as db:
-        todo = await todo_service.complete_todo(db, todo_id)
-        if todo is None:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="TODO not found",
-            )
-        return todo
+    todo = await todo_service.complete_todo(db, todo_id)
+    if todo is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="TODO not found",
+        )
+    return todo
 
 
 @router.post("/{todo_id}/reopen", response_model=TodoResponse)
-async def reopen_todo(todo_id: int, _: str = Depends(verify_token)):
+async def reopen_todo(todo_id: int, db: aiosqlite.Connection = Depends(get_writer_db)):
     """Reopen a completed TODO."""
-    async with get_db() as db:
-        todo = await todo_service.reopen_todo(db, todo_id)
-        if todo is None:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="TODO not found",
-            )
-        return todo
+    todo = await todo_service.reopen_todo(db, todo_id)
+    if todo is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="TODO not found",
+        )
+    return todo
@@ -1,34 +1,90 @@
-from datetime import datetime
-from typing import List, Optional
+from datetime import date, datetime
+from functools import lru_cache
+from typing import List, Optional, Tuple
 
 import aiosqlite
 
 from app.models.todo import TodoCreate, TodoResponse, TodoUpdate
 
 
+_FETCH_SIZE = 256
+
+# Sort by due_date ascending (NULLs last), then priority ascending
+_LIST_ORDER = " ORDER BY due_date ASC NULLS LAST, priority ASC"
+_LIST_BASE = "SELECT * FROM todos WHERE deleted_at IS NULL"
+
+# One fixed SQL string per (status filter?, priority filter?) so SQLite's statement cache hits
+_LIST_SQL = {
+    (False, False): _LIST_BASE + _LIST_ORDER,
+    (True, False): _LIST_BASE + " AND status = ?" + _LIST_ORDER,
+    (False, True): _LIST_BASE + " AND priority = ?" + _LIST_ORDER,
+    (True, True): _LIST_BASE + " AND status = ? AND priority = ?" + _LIST_ORDER,
+}
+
+
+# Columns update_todo may write, in the order they appear in the SET clause
+_UPDATE_ORDER = ("description", "due_date_text", "due_date", "notes", "priority", "gcal_event_id")
+_UPDATABLE = frozenset(_UPDATE_ORDER)
+
+
+@lru_cache(maxsize=None)
+def _update_sql(fields: Tuple[str, ...]) -> str:
+    """Build (once per combination of fields) the UPDATE used by update_todo."""
+    assignments = "".join(f"{field} = ?, " for field in fields)
+    return (
+        f"UPDATE todos SET {assignments}updated_at = CURRENT_TIMESTAMP "
+        "WHERE id = ? AND deleted_at IS NULL RETURNING *"
+    )
+
+
+def _parse_date(value: Optional[str]) -> Optional[date]:
+    return date.fromisoformat(value) if value is not None else None
+
+
+def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value is not None else None
+
+
 def _row_to_todo(row: aiosqlite.Row) -> TodoResponse:
-    """Convert a database row to a TodoResponse."""
-    return TodoResponse(
+    """Convert a database row to a TodoResponse.
+
+    The schema's CHECK constraints already guarantee valid values, so this
+    skips Pydantic validation and only parses the stored ISO strings.
+    """
+    return TodoResponse.model_construct(
         id=row["id"],
         description=row["description"],
         due_date_text=row["due_date_text"],
-        due_date=row["due_date"],
+        due_date=_parse_date(row["due_date"]),
         notes=row["notes"],
         priority=row["priority"],
         status=row["status"],
         gcal_event_id=row["gcal_event_id"],
-        created_at=row["created_at"],
-        updated_at=row["updated_at"],
-        completed_at=row["completed_at"],
+        created_at=_parse_datetime(row["created_at"]),
+        updated_at=_parse_datetime(row["updated_at"]),
+        completed_at=_parse_datetime(row["completed_at"]),
     )
 
 
+async def _execute_returning(
+    db: aiosqlite.Connection, query: str, params
+) -> Optional[TodoResponse]:
+    """Run a mutation ending in RETURNING * and commit. None if no row matched."""
+    cursor = await db.execute(query, params)
+    row = await cursor.fetchone()
+    await db.commit()
+    if row is None:
+        return None
+    return _row_to_todo(row)
+
+
 async def create_todo(db: aiosqlite.Connection, data: TodoCreate) -> TodoResponse:
     """Create a new TODO."""
     cursor = await db.execute(
         """
         INSERT INTO todos (description, due_date_text, due_date, notes, priority, gcal_event_id)
         VALUES (?, ?, ?, ?, ?, ?)
+        RETURNING id, created_at, updated_at
         """,
         (
             data.description,
@@ -39,10 +95,23 @@ async def create_todo(db: aiosqlite.Connection, data: TodoCreate) -> TodoRespons
             data.gcal_event_id,
         ),
     )
+    row = await cursor.fetchone()
     await db.commit()
 
-    todo_id = cursor.lastrowid
-    return await get_todo(db, todo_id)
+    # Everything except the server-assigned columns is already validated on `data`
+    return TodoResponse.model_construct(
+        id=row["id"],
+        description=data.description,
+        due_date_text=data.due_date_text,
+        due_date=data.due_date,
+        notes=data.notes,
+        priority=data.priority,
+        status="pending",
+        gcal_event_id=data.gcal_event_id,
+        created_at=_parse_datetime(row["created_at"]),
+        updated_at=_parse_datetime(row["updated_at"]),
+        completed_at=None,
+    )
 
 
 async def get_todo(db: aiosqlite.Connection, todo_id: int) -> Optional[TodoResponse]:
@@ -63,113 +132,81 @@ async def list_todos(
     priority: Optional[int] = None,
 ) -> List[TodoResponse]:
     """List TODOs with optional filters, sorted by due_date (NULLs last) then priority."""
-    query = "SELECT * FROM todos WHERE deleted_at IS NULL"
-    params: List = []
-
+    params = []
     if status:
-        query += " AND status = ?"
         params.append(status)
-
     if priority:
-        query += " AND priority = ?"
         params.append(priority)
 
-    # Sort by due_date ascending (NULLs last), then priority ascending
-    query += " ORDER BY CASE WHEN due_date IS NULL THEN 1 ELSE 0 END, due_date ASC, priority ASC"
-
+    query = _LIST_SQL[(bool(status), bool(priority))]
     cursor = await db.execute(query, params)
-    rows = await cursor.fetchall()
-    return [_row_to_todo(row) for row in rows]
+    todos = []
+    # Decode in batches rather than materializing every row up front
+    while rows := await cursor.fetchmany(_FETCH_SIZE):
+        todos.extend(_row_to_todo(row) for row in rows)
+    return todos
 
 
 async def update_todo(
     db: aiosqlite.Connection, todo_id: int, data: TodoUpdate
 ) -> Optional[TodoResponse]:
     """Update a TODO with partial data."""
-    # First check if TODO exists and is not deleted
-    existing = await get_todo(db, todo_id)
-    if existing is None:
-        return None
+    unknown = data.model_fields_set - _UPDATABLE
+    if unknown:
+        raise ValueError(f"Cannot update fields: {', '.join(sorted(unknown))}")
 
-    # Build update query dynamically based on provided fields
-    updates = []
-    params = []
-
-    update_data = data.model_dump(exclude_unset=True)
+    # Fixed column order so each combination of fields maps to one SQL string
+    fields = tuple(field for field in _UPDATE_ORDER if field in data.model_fields_set)
+    if not fields:
+        return await get_todo(db, todo_id)
 
-    for field, value in update_data.items():
+    params = []
+    for field in fields:
+        value = getattr(data, field)
         if field == "due_date" and value is not None:
             value = value.isoformat()
-        updates.append(f"{field} = ?")
         params.append(value)
+    params.append(todo_id)
 
-    if updates:
-        updates.append("updated_at = ?")
-        params.append(datetime.utcnow().isoformat())
-        params.append(todo_id)
-
-        query = f"UPDATE todos SET {', '.join(updates)} WHERE id = ? AND deleted_at IS NULL"
-        await db.execute(query, params)
-        await db.commit()
-
-    return await get_todo(db, todo_id)
+    return await _execute_returning(db, _update_sql(fields), params)
 
 
 async def delete_todo(db: aiosqlite.Connection, todo_id: int) -> bool:
     """Soft delete a TODO by setting deleted_at."""
-    # Check if TODO exists and is not already deleted
-    existing = await get_todo(db, todo_id)
-    if existing is None:
-        return False
-
-    await db.execute(
-        "UPDATE todos SET deleted_at = ?, updated_at = ? WHERE id = ?",
-        (datetime.utcnow().isoformat(), datetime.utcnow().isoformat(), todo_id),
+    cursor = await db.execute(
+        "UPDATE todos SET deleted_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP "
+        "WHERE id = ? AND deleted_at IS NULL",
+        (todo_id,),
     )
     await db.commit()
-    return True
+    return cursor.rowcount > 0
 
 
 async def complete_todo(db: aiosqlite.Connection, todo_id: int) -> Optional[TodoResponse]:
     """Mark a TODO as completed."""
-    existing = await get_todo(db, todo_id)
-    if existing is None:
-        return None
-
-    now = datetime.utcnow().isoformat()
-    await db.execute(
-        "UPDATE todos SET status = 'completed', completed_at = ?, updated_at = ? WHERE id = ?",
-        (now, now, todo_id),
+    return await _execute_returning(
+        db,
+        "UPDATE todos SET status = 'completed', completed_at = CURRENT_TIMESTAMP, "
+        "updated_at = CURRENT_TIMESTAMP WHERE id = ? AND deleted_at IS NULL RETURNING *",
+        (todo_id,),
     )
-    await db.commit()
-    return await get_todo(db, todo_id)
 
 
 async def reopen_todo(db: aiosqlite.Connection, todo_id: int) -> Optional[TodoResponse]:
     """Reopen a completed TODO."""
-    existing = await get_todo(db, todo_id)
-    if existing is None:
-        return None
-
-    now = datetime.utcnow().isoformat()
-    await db.execute(
-        "UPDATE todos SET status = 'pending', completed_at = NULL, updated_at = ? WHERE id = ?",
-        (now, todo_id),
+    return await _execute_returning(
+        db,
+        "UPDATE todos SET status = 'pending', completed_at = NULL, "
+        "updated_at = CURRENT_TIMESTAMP WHERE id = ? AND deleted_at IS NULL RETURNING *",
+        (todo_id,),
     )
-    await db.commit()
-    return await get_todo(db, todo_id)
 
 
 async def purge_deleted(db: aiosqlite.Connection) -> int:
     """Permanently delete all soft-deleted TODOs. Returns count of purged items."""
-    cursor = await db.execute("SELECT COUNT(*) FROM todos WHERE deleted_at IS NOT NULL")
-    row = await cursor.fetchone()
-    count = row[0]
-
-    await db.execute("DELETE FROM todos WHERE deleted_at IS NOT NULL")
+    cursor = await db.execute("DELETE FROM todos WHERE deleted_at IS NOT NULL")
     await db.commit()
-
-    return count
+    return cursor.rowcount
 
 
 async def bulk_create_todos(
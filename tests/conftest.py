@@ -1,97 +1,148 @@
+import asyncio
 import os
-import tempfile
-from contextlib import asynccontextmanager
 
-import aiosqlite
+import httpx
+import orjson
 import pytest
 import pytest_asyncio
+from pytest_asyncio import is_async_test
 from httpx import ASGITransport, AsyncClient
 
 # Set environment variables before importing app modules
 os.environ["JAKETODO_API_TOKEN"] = "test_token"
 os.environ["DATABASE_PATH"] = ":memory:"
 
-from app.database import init_db
+from app.database import ConnectionPool, init_db
 from app.main import app
 
 
+def pytest_collection_modifyitems(items):
+    """Run every async test on the session event loop the shared fixtures live on."""
+    session_loop = pytest.mark.asyncio(loop_scope="session")
+    for item in items:
+        if is_async_test(item):
+            item.add_marker(session_loop, append=False)
+
+
 @pytest.fixture(scope="session")
-def anyio_backend():
-    return "asyncio"
+def event_loop_policy():
+    """Run the async tests on uvloop where it is installed (uvicorn[standard] pulls it in)."""
+    try:
+        import uvloop
+    except ImportError:  # e.g. Windows, where uvloop isn't available
+        return asyncio.DefaultEventLoopPolicy()
+    return uvloop.EventLoopPolicy()
 
 
-@pytest_asyncio.fixture
-async def test_db():
-    """Create a fresh temporary database for each test."""
-    # Use a temp file for the database so connections share state
-    with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as f:
-        db_path = f.name
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
 
-    await init_db(db_path)
 
-    db = await aiosqlite.connect(db_path)
-    db.row_factory = aiosqlite.Row
+@pytest.fixture(scope="session")
+def test_db_path(tmp_path_factory):
+    """Path of the session's test database file."""
+    # A real file (not a shared-cache in-memory database) so concurrent readers and
+    # the writer get WAL snapshot isolation instead of SQLITE_LOCKED table locks
+    return str(tmp_path_factory.mktemp("db") / "todos.db")
+
+
+@pytest_asyncio.fixture(scope="session")
+async def test_pool(test_db_path):
+    """Create one WAL database file and connection pool for the test session."""
+    await init_db(test_db_path)
+    pool = await ConnectionPool.open(test_db_path, size=2)
+    # Keep WAL for the reader/writer split but skip fsync: the file is thrown away
+    for db in (pool.writer, *pool._readers):
+        await db.execute("PRAGMA synchronous=OFF")
     try:
-        yield db
+        yield pool
     finally:
-        await db.close()
-        # Clean up temp file
-        try:
-            os.unlink(db_path)
-        except OSError:
-            pass
+        await pool.close()
 
 
-@pytest_asyncio.fixture
-async def test_client(test_db):
-    """Create a test client with auth headers and mocked database."""
+@pytest.fixture(scope="session", autouse=True)
+def orjson_responses():
+    """Decode test response bodies with orjson instead of the stdlib json module."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(httpx.Response, "json", lambda self, **kwargs: orjson.loads(self.content))
+        yield
 
-    @asynccontextmanager
-    async def mock_get_db(db_path=None):
-        yield test_db
 
-    # Patch get_db to use our test database
-    import app.routers.todos as todos_module
-    import app.routers.admin as admin_module
+@pytest.fixture(scope="session")
+def asgi_transport():
+    """One in-process ASGI transport shared by every test client."""
+    return ASGITransport(app=app, raise_app_exceptions=False)
 
-    original_todos_get_db = todos_module.get_db
-    original_admin_get_db = admin_module.get_db
 
-    todos_module.get_db = mock_get_db
-    admin_module.get_db = mock_get_db
+@pytest_asyncio.fixture(scope="session")
+async def test_client(test_pool, asgi_transport):
+    """Create a session-wide test client with auth headers and the test connection pool."""
+    original_pool = getattr(app.state, "pool", None)
+    app.state.pool = test_pool
 
     try:
-        transport = ASGITransport(app=app)
         async with AsyncClient(
-            transport=transport,
+            transport=asgi_transport,
             base_url="http://test",
             headers={"Authorization": "Bearer test_token"},
+            timeout=None,
         ) as client:
+            # Warm routing, auth, the reader pool and the statement caches up front
+            # so the first test doesn't absorb that one-off cost
+            await client.get("/todos")
             yield client
     finally:
-        todos_module.get_db = original_todos_get_db
-        admin_module.get_db = original_admin_get_db
+        app.state.pool = original_pool
 
 
-@pytest_asyncio.fixture
-async def unauthenticated_client():
-    """Create a test client without auth headers."""
-    transport = ASGITransport(app=app)
-    async with AsyncClient(transport=transport, base_url="http://test") as client:
+@pytest.fixture(scope="session")
+def clean_changes():
+    """The writer's total_changes as of the last time the test database was emptied."""
+    return {"total": 0}
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def reset_db(request, clean_changes):
+    """Clear rows written through the shared test client once each test finishes.
+
+    The services commit every write, so a per-test transaction can't simply be
+    rolled back. Instead the table is wiped, and only if the test changed it.
+    """
+    yield
+    if "test_client" not in request.fixturenames:
+        return
+    writer = request.getfixturevalue("test_pool").writer
+    if writer.total_changes == clean_changes["total"]:
+        return
+    await writer.execute("DELETE FROM todos")
+    await writer.commit()
+    clean_changes["total"] = writer.total_changes
+
+
+@pytest_asyncio.fixture(scope="session")
+async def unauthenticated_client(asgi_transport):
+    """Create a session-wide test client without auth headers."""
+    async with AsyncClient(
+        transport=asgi_transport, base_url="http://test", timeout=None
+    ) as client:
         yield client
 
 
-@pytest_asyncio.fixture
-async def sample_todo(test_client):
-    """Create a sample TODO for testing."""
-    response = await test_client.post(
-        "/todos",
-        json={
+@pytest.fixture
+def sample_todo(test_client):
+    """Factory that creates a sample TODO; keyword arguments override its fields."""
+
+    async def make(**overrides):
+        todo = {
             "description": "Test TODO",
             "due_date_text": "tomorrow",
             "due_date": "2025-01-15",
             "notes": "Test notes",
             "priority": 2,
-        },
-    )
-    return response.json()
+            **overrides,
+        }
+        response = await test_client.post("/todos/bulk", json={"todos": [todo]})
+        return response.json()["todos"][0]
+
+    return make
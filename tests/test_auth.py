@@ -1,20 +1,22 @@
 import os
 import tempfile
+from types import SimpleNamespace
 
 import pytest
 import pytest_asyncio
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
 
-from app.database import get_db, init_db
+from app.auth import verify_token
+from app.database import ConnectionPool, get_reader_db, get_writer_db, init_db
 
 
-@pytest.mark.asyncio
 async def test_missing_auth_header_returns_401(unauthenticated_client):
     """Test that missing auth header returns 401."""
     response = await unauthenticated_client.get("/todos")
     assert response.status_code == 403  # HTTPBearer returns 403 when no header
 
 
-@pytest.mark.asyncio
 async def test_invalid_token_returns_401(unauthenticated_client):
     """Test that invalid token returns 401."""
     response = await unauthenticated_client.get(
@@ -24,14 +26,60 @@ async def test_invalid_token_returns_401(unauthenticated_client):
     assert response.json()["detail"] == "Invalid authentication token"
 
 
-@pytest.mark.asyncio
+async def test_token_prefix_returns_401(unauthenticated_client):
+    """Test that a prefix of the valid token is rejected."""
+    response = await unauthenticated_client.get(
+        "/todos", headers={"Authorization": "Bearer test"}
+    )
+    assert response.status_code == 401
+
+
+@pytest.mark.parametrize(
+    "headers, status_code",
+    [
+        ({"Authorization": "Bearer wrong_token"}, 401),
+        ({"Authorization": "Basic dGVzdF90b2tlbg=="}, 403),
+        ({}, 403),
+    ],
+)
+@pytest.mark.parametrize("path", ["/todos", "/todos/bulk"])
+async def test_auth_rejected_before_body_is_parsed(
+    unauthenticated_client, path, headers, status_code
+):
+    """Test that bad credentials win over a malformed JSON body."""
+    response = await unauthenticated_client.post(
+        path,
+        content=b"{not json",
+        headers={"content-type": "application/json", **headers},
+    )
+    assert response.status_code == status_code
+
+
+async def test_invalid_token_rejected_before_body_validation(unauthenticated_client):
+    """Test that auth fails before an invalid request body is validated."""
+    response = await unauthenticated_client.post(
+        "/todos",
+        json={"description": ""},
+        headers={"Authorization": "Bearer wrong_token"},
+    )
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Invalid authentication token"
+
+
+async def test_verify_token_dependency_rejects_wrong_token():
+    """Test the router-level dependency on its own, behind the middleware."""
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials="wrong_token")
+    with pytest.raises(HTTPException) as exc_info:
+        await verify_token(credentials)
+    assert exc_info.value.status_code == 401
+
+
 async def test_valid_token_allows_access(test_client):
     """Test that valid token allows access."""
     response = await test_client.get("/todos")
     assert response.status_code == 200
 
 
-@pytest.mark.asyncio
 async def test_health_endpoint_no_auth_required(unauthenticated_client):
     """Test that health endpoint doesn't require auth."""
     response = await unauthenticated_client.get("/health")
@@ -39,30 +87,135 @@ async def test_health_endpoint_no_auth_required(unauthenticated_client):
     assert response.json() == {"status": "healthy"}
 
 
-@pytest.mark.asyncio
-async def test_get_db_context_manager():
-    """Test that get_db properly opens and closes connections."""
+async def test_health_cross_origin_gets_cors_headers(unauthenticated_client):
+    """Test that cross-origin health probes still get CORS headers."""
+    response = await unauthenticated_client.get(
+        "/health", headers={"Origin": "https://status.example.com"}
+    )
+    assert response.status_code == 200
+    assert response.json() == {"status": "healthy"}
+    assert response.headers["access-control-allow-origin"] == "*"
+    assert response.headers["access-control-allow-credentials"] == "true"
+
+
+async def test_health_head_has_no_body(unauthenticated_client):
+    """Test that HEAD /health is answered without a body."""
+    response = await unauthenticated_client.head("/health")
+    assert response.status_code == 200
+    assert response.content == b""
+
+
+async def test_health_other_methods_fall_through(unauthenticated_client):
+    """Test that non-GET /health requests still go through routing."""
+    response = await unauthenticated_client.post("/health")
+    assert response.status_code == 405
+
+
+async def test_health_route_matches_middleware():
+    """Test that the documented route returns the same payload as the middleware."""
+    import orjson
+
+    from app.main import HEALTH_BODY, health_check
+
+    assert await health_check() == orjson.loads(HEALTH_BODY)
+
+
+async def test_connection_pool_dependencies():
+    """Test that the pool dependencies hand out its reader and writer connections."""
     with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as f:
         db_path = f.name
 
     try:
         await init_db(db_path)
 
-        async with get_db(db_path) as db:
-            # Verify we can use the connection
-            cursor = await db.execute("SELECT 1")
-            result = await cursor.fetchone()
-            assert result[0] == 1
+        pool = await ConnectionPool.open(db_path)
+        try:
+            request = SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace(pool=pool)))
+            async for db in get_writer_db(request):
+                assert db is pool.writer
+                assert pool.write_lock.locked()
+            assert not pool.write_lock.locked()
+
+            cursor = await pool.writer.execute("PRAGMA journal_mode")
+            assert (await cursor.fetchone())[0] == "wal"
+            cursor = await pool.writer.execute("PRAGMA synchronous")
+            assert (await cursor.fetchone())[0] == 1  # NORMAL
+
+            async for db in get_reader_db(request):
+                assert db is not pool.writer
+                # Verify we can use the connection
+                cursor = await db.execute("SELECT 1")
+                result = await cursor.fetchone()
+                assert result[0] == 1
+        finally:
+            await pool.close()
     finally:
         os.unlink(db_path)
 
 
-@pytest.mark.asyncio
+async def test_session_pool_skips_fsync(test_pool):
+    """Test that the session test pool keeps WAL but turns off fsync."""
+    cursor = await test_pool.writer.execute("PRAGMA journal_mode")
+    assert (await cursor.fetchone())[0] == "wal"
+    async with test_pool.reader() as db:
+        cursor = await db.execute("PRAGMA synchronous")
+        assert (await cursor.fetchone())[0] == 0  # OFF
+
+
+async def test_memory_pool_reads_through_writer():
+    """Test that an in-memory pool has no readers and reads via the writer."""
+    pool = await ConnectionPool.open(":memory:")
+    try:
+        async with pool.reader() as db:
+            assert db is pool.writer
+    finally:
+        await pool.close()
+
+
 async def test_app_lifespan():
     """Test that app lifespan initializes database."""
-    from app.main import lifespan, app
+    from fastapi import FastAPI
+
+    from app.main import lifespan
 
-    # Directly test the lifespan context manager
+    # Use a throwaway app so the shared test client's pool is left alone
+    app = FastAPI()
     async with lifespan(app):
-        # The database should be initialized now
-        pass
+        # The database should be initialized and the pool open
+        cursor = await app.state.pool.writer.execute("SELECT 1")
+        assert (await cursor.fetchone())[0] == 1
+
+
+def test_get_settings_returns_shared_instance():
+    """Test that get_settings builds Settings once and reuses it."""
+    from app.config import get_settings
+
+    assert get_settings() is get_settings()
+
+
+async def test_token_read_through_get_settings(test_client, monkeypatch):
+    """Test that a rebuilt Settings takes effect without re-importing the app."""
+    from app.config import get_settings
+
+    monkeypatch.setenv("JAKETODO_API_TOKEN", "rotated_token")
+    get_settings.cache_clear()
+    try:
+        rotated = await test_client.get(
+            "/todos", headers={"Authorization": "Bearer rotated_token"}
+        )
+        stale = await test_client.get("/todos")
+    finally:
+        monkeypatch.undo()
+        get_settings.cache_clear()
+
+    assert rotated.status_code == 200
+    assert stale.status_code == 401
+
+
+def test_settings_token_bytes():
+    """Test that the configured token is exposed pre-encoded."""
+    from app.config import get_settings
+
+    settings = get_settings()
+    assert settings.token_bytes == b"test_token"
+    assert settings.token_bytes is settings.token_bytes
@@ -1,5 +1,4 @@
-import os
-import tempfile
+from datetime import datetime
 
 import aiosqlite
 import pytest
@@ -10,28 +9,32 @@ from app.models.todo import TodoCreate, TodoUpdate
 from app.services import todo_service
 
 
-@pytest_asyncio.fixture
-async def service_db():
-    """Create a fresh temporary database for service tests."""
-    with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as f:
-        db_path = f.name
+@pytest_asyncio.fixture(scope="session")
+async def template_db():
+    """Build the schema once per session in an in-memory template database."""
+    uri = "file:jaketodo_template?mode=memory&cache=shared"
+    # The open connection keeps the shared in-memory database alive while init_db runs
+    db = await aiosqlite.connect(uri, uri=True)
+    try:
+        await init_db(uri)
+        yield db
+    finally:
+        await db.close()
 
-    await init_db(db_path)
 
-    db = await aiosqlite.connect(db_path)
+@pytest_asyncio.fixture
+async def service_db(template_db):
+    """Clone the template into a fresh in-memory database for each service test."""
+    db = await aiosqlite.connect(":memory:")
+    await template_db.backup(db)
     db.row_factory = aiosqlite.Row
     try:
         yield db
     finally:
         await db.close()
-        try:
-            os.unlink(db_path)
-        except OSError:
-            pass
 
 
 class TestCreateTodo:
-    @pytest.mark.asyncio
     async def test_create_todo_returns_todo_response(self, service_db):
         """Test that create_todo returns a TodoResponse."""
         data = TodoCreate(description="Test todo")
@@ -42,7 +45,6 @@ class TestCreateTodo:
         assert result.priority == 3
         assert result.status == "pending"
 
-    @pytest.mark.asyncio
     async def test_create_todo_with_all_fields(self, service_db):
         """Test creating a todo with all fields."""
         from datetime import date
@@ -66,7 +68,6 @@ class TestCreateTodo:
 
 
 class TestGetTodo:
-    @pytest.mark.asyncio
     async def test_get_existing_todo(self, service_db):
         """Test getting an existing todo."""
         data = TodoCreate(description="Test todo")
@@ -75,14 +76,14 @@ class TestGetTodo:
         result = await todo_service.get_todo(service_db, created.id)
         assert result is not None
         assert result.id == created.id
+        assert result.created_at == created.created_at
+        assert isinstance(result.created_at, datetime)
 
-    @pytest.mark.asyncio
     async def test_get_nonexistent_todo_returns_none(self, service_db):
         """Test that getting a non-existent todo returns None."""
         result = await todo_service.get_todo(service_db, 99999)
         assert result is None
 
-    @pytest.mark.asyncio
     async def test_get_deleted_todo_returns_none(self, service_db):
         """Test that getting a deleted todo returns None."""
         data = TodoCreate(description="Test todo")
@@ -94,13 +95,11 @@ class TestGetTodo:
 
 
 class TestListTodos:
-    @pytest.mark.asyncio
     async def test_list_todos_empty(self, service_db):
         """Test listing todos when empty."""
         result = await todo_service.list_todos(service_db)
         assert result == []
 
-    @pytest.mark.asyncio
     async def test_list_todos_excludes_deleted(self, service_db):
         """Test that list excludes deleted todos."""
         data = TodoCreate(description="Test todo")
@@ -110,7 +109,6 @@ class TestListTodos:
         result = await todo_service.list_todos(service_db)
         assert len(result) == 0
 
-    @pytest.mark.asyncio
     async def test_list_todos_filter_by_status(self, service_db):
         """Test filtering by status."""
         await todo_service.create_todo(service_db, TodoCreate(description="Pending"))
@@ -126,7 +124,6 @@ class TestListTodos:
         assert len(completed_result) == 1
         assert completed_result[0].description == "Completed"
 
-    @pytest.mark.asyncio
     async def test_list_todos_filter_by_priority(self, service_db):
         """Test filtering by priority."""
         await todo_service.create_todo(
@@ -142,7 +139,6 @@ class TestListTodos:
 
 
 class TestUpdateTodo:
-    @pytest.mark.asyncio
     async def test_update_todo(self, service_db):
         """Test updating a todo."""
         data = TodoCreate(description="Original")
@@ -154,14 +150,12 @@ class TestUpdateTodo:
         assert result is not None
         assert result.description == "Updated"
 
-    @pytest.mark.asyncio
     async def test_update_nonexistent_todo_returns_none(self, service_db):
         """Test that updating non-existent todo returns None."""
         update_data = TodoUpdate(description="Updated")
         result = await todo_service.update_todo(service_db, 99999, update_data)
         assert result is None
 
-    @pytest.mark.asyncio
     async def test_update_with_no_changes(self, service_db):
         """Test updating with empty data."""
         data = TodoCreate(description="Original")
@@ -173,7 +167,15 @@ class TestUpdateTodo:
         assert result is not None
         assert result.description == "Original"
 
-    @pytest.mark.asyncio
+    async def test_update_rejects_unknown_fields(self, service_db):
+        """Test that fields outside the update whitelist are never written."""
+        data = TodoCreate(description="Test")
+        created = await todo_service.create_todo(service_db, data)
+
+        update_data = TodoUpdate.model_construct(_fields_set={"status"})
+        with pytest.raises(ValueError, match="status"):
+            await todo_service.update_todo(service_db, created.id, update_data)
+
     async def test_update_due_date(self, service_db):
         """Test updating due_date."""
         from datetime import date
@@ -189,7 +191,6 @@ class TestUpdateTodo:
 
 
 class TestDeleteTodo:
-    @pytest.mark.asyncio
     async def test_delete_todo(self, service_db):
         """Test soft deleting a todo."""
         data = TodoCreate(description="Test")
@@ -202,7 +203,15 @@ class TestDeleteTodo:
         get_result = await todo_service.get_todo(service_db, created.id)
         assert get_result is None
 
-    @pytest.mark.asyncio
+    async def test_delete_already_deleted_todo_returns_false(self, service_db):
+        """Test that deleting an already deleted todo returns False."""
+        data = TodoCreate(description="Test")
+        created = await todo_service.create_todo(service_db, data)
+        await todo_service.delete_todo(service_db, created.id)
+
+        result = await todo_service.delete_todo(service_db, created.id)
+        assert result is False
+
     async def test_delete_nonexistent_todo_returns_false(self, service_db):
         """Test that deleting non-existent todo returns False."""
         result = await todo_service.delete_todo(service_db, 99999)
@@ -210,7 +219,6 @@ class TestDeleteTodo:
 
 
 class TestCompleteTodo:
-    @pytest.mark.asyncio
     async def test_complete_todo(self, service_db):
         """Test completing a todo."""
         data = TodoCreate(description="Test")
@@ -222,7 +230,6 @@ class TestCompleteTodo:
         assert result.status == "completed"
         assert result.completed_at is not None
 
-    @pytest.mark.asyncio
     async def test_complete_nonexistent_todo_returns_none(self, service_db):
         """Test that completing non-existent todo returns None."""
         result = await todo_service.complete_todo(service_db, 99999)
@@ -230,7 +237,6 @@ class TestCompleteTodo:
 
 
 class TestReopenTodo:
-    @pytest.mark.asyncio
     async def test_reopen_todo(self, service_db):
         """Test reopening a completed todo."""
         data = TodoCreate(description="Test")
@@ -243,7 +249,15 @@ class TestReopenTodo:
         assert result.status == "pending"
         assert result.completed_at is None
 
-    @pytest.mark.asyncio
+    async def test_reopen_deleted_todo_returns_none(self, service_db):
+        """Test that reopening a deleted todo returns None."""
+        data = TodoCreate(description="Test")
+        created = await todo_service.create_todo(service_db, data)
+        await todo_service.delete_todo(service_db, created.id)
+
+        result = await todo_service.reopen_todo(service_db, created.id)
+        assert result is None
+
     async def test_reopen_nonexistent_todo_returns_none(self, service_db):
         """Test that reopening non-existent todo returns None."""
         result = await todo_service.reopen_todo(service_db, 99999)
@@ -251,7 +265,6 @@ class TestReopenTodo:
 
 
 class TestPurgeDeleted:
-    @pytest.mark.asyncio
     async def test_purge_deleted(self, service_db):
         """Test purging deleted todos."""
         data = TodoCreate(description="Test")
@@ -261,13 +274,11 @@ class TestPurgeDeleted:
         count = await todo_service.purge_deleted(service_db)
         assert count == 1
 
-    @pytest.mark.asyncio
     async def test_purge_with_no_deleted_returns_zero(self, service_db):
         """Test purging when no deleted todos."""
         count = await todo_service.purge_deleted(service_db)
         assert count == 0
 
-    @pytest.mark.asyncio
     async def test_purge_does_not_affect_active_todos(self, service_db):
         """Test that purge doesn't affect active todos."""
         data = TodoCreate(description="Active")
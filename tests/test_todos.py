@@ -1,36 +1,54 @@
+import asyncio
+
+import orjson
 import pytest
 
+from app.database import connect_db
+
+# Static request bodies, encoded once at import instead of on every request
+_JSON_HEADERS = {"content-type": "application/json"}
+_BULK_PAYLOAD = orjson.dumps(
+    {
+        "todos": [
+            {"description": "First bulk todo", "priority": 1},
+            {"description": "Second bulk todo", "priority": 2},
+            {"description": "Third bulk todo", "priority": 3},
+        ]
+    }
+)
+_SINGLE_BULK_PAYLOAD = orjson.dumps(
+    {"todos": [{"description": "Single bulk todo", "priority": 2}]}
+)
+_SORT_ORDER_PAYLOAD = orjson.dumps(
+    {
+        "todos": [
+            {"description": "Later high", "due_date": "2025-01-20", "priority": 1},
+            {"description": "Earlier low", "due_date": "2025-01-10", "priority": 4},
+            {"description": "Same date low", "due_date": "2025-01-10", "priority": 3},
+            {"description": "No date", "priority": 1},
+        ]
+    }
+)
+
 
 class TestCreateTodo:
-    @pytest.mark.asyncio
     async def test_create_todo_with_all_fields(self, test_client):
         """Test creating a TODO with all fields."""
-        response = await test_client.post(
-            "/todos",
-            json={
-                "description": "Complete project",
-                "due_date_text": "next Friday",
-                "due_date": "2025-01-17",
-                "notes": "Important project",
-                "priority": 1,
-                "gcal_event_id": "cal123",
-            },
-        )
+        payload = {
+            "description": "Complete project",
+            "due_date_text": "next Friday",
+            "due_date": "2025-01-17",
+            "notes": "Important project",
+            "priority": 1,
+            "gcal_event_id": "cal123",
+        }
+        response = await test_client.post("/todos", json=payload)
         assert response.status_code == 201
         data = response.json()
-        assert data["description"] == "Complete project"
-        assert data["due_date_text"] == "next Friday"
-        assert data["due_date"] == "2025-01-17"
-        assert data["notes"] == "Important project"
-        assert data["priority"] == 1
-        assert data["status"] == "pending"
-        assert data["gcal_event_id"] == "cal123"
-        assert data["id"] is not None
-        assert data["created_at"] is not None
-        assert data["updated_at"] is not None
-        assert data["completed_at"] is None
+        expected = {**payload, "status": "pending", "completed_at": None}
+        assert expected.items() <= data.items()
+        assert all(data[key] is not None for key in ("id", "created_at", "updated_at"))
 
-    @pytest.mark.asyncio
     async def test_create_todo_with_only_description(self, test_client):
         """Test creating a TODO with only required field."""
         response = await test_client.post(
@@ -39,148 +57,89 @@ class TestCreateTodo:
         )
         assert response.status_code == 201
         data = response.json()
-        assert data["description"] == "Simple todo"
-        assert data["priority"] == 3  # default
-        assert data["status"] == "pending"
-        assert data["due_date_text"] is None
-        assert data["due_date"] is None
-        assert data["notes"] is None
-        assert data["gcal_event_id"] is None
-
-    @pytest.mark.asyncio
-    async def test_create_todo_empty_description_fails(self, test_client):
-        """Test that empty description fails validation."""
-        response = await test_client.post(
-            "/todos",
-            json={"description": ""},
-        )
-        assert response.status_code == 422
-
-    @pytest.mark.asyncio
-    async def test_create_todo_invalid_priority_fails(self, test_client):
-        """Test that invalid priority fails validation."""
-        response = await test_client.post(
-            "/todos",
-            json={"description": "Test", "priority": 5},
-        )
-        assert response.status_code == 422
-
-        response = await test_client.post(
-            "/todos",
-            json={"description": "Test", "priority": 0},
-        )
+        expected = {
+            "description": "Simple todo",
+            "priority": 3,  # default
+            "status": "pending",
+            "due_date_text": None,
+            "due_date": None,
+            "notes": None,
+            "gcal_event_id": None,
+        }
+        assert expected.items() <= data.items()
+
+    @pytest.mark.parametrize(
+        "body",
+        [
+            {"description": ""},  # empty description
+            {"description": "Test", "priority": 5},  # priority too high
+            {"description": "Test", "priority": 0},  # priority too low
+        ],
+    )
+    async def test_create_todo_invalid_fails(self, test_client, body):
+        """Test that an invalid TODO fails validation."""
+        response = await test_client.post("/todos", json=body)
         assert response.status_code == 422
 
 
 class TestBulkCreateTodos:
-    @pytest.mark.asyncio
     async def test_bulk_create_multiple_todos(self, test_client):
         """Test creating multiple TODOs at once."""
         response = await test_client.post(
-            "/todos/bulk",
-            json={
-                "todos": [
-                    {"description": "First bulk todo", "priority": 1},
-                    {"description": "Second bulk todo", "priority": 2},
-                    {"description": "Third bulk todo", "priority": 3},
-                ]
-            },
+            "/todos/bulk", content=_BULK_PAYLOAD, headers=_JSON_HEADERS
         )
         assert response.status_code == 201
         data = response.json()
-        assert "todos" in data
-        assert "count" in data
         assert data["count"] == 3
-        assert len(data["todos"]) == 3
-        assert data["todos"][0]["description"] == "First bulk todo"
-        assert data["todos"][1]["description"] == "Second bulk todo"
-        assert data["todos"][2]["description"] == "Third bulk todo"
+        assert [todo["description"] for todo in data["todos"]] == [
+            "First bulk todo",
+            "Second bulk todo",
+            "Third bulk todo",
+        ]
 
-    @pytest.mark.asyncio
     async def test_bulk_create_single_todo(self, test_client):
         """Test bulk create with a single TODO."""
         response = await test_client.post(
-            "/todos/bulk",
-            json={
-                "todos": [
-                    {"description": "Single bulk todo", "priority": 2},
-                ]
-            },
+            "/todos/bulk", content=_SINGLE_BULK_PAYLOAD, headers=_JSON_HEADERS
         )
         assert response.status_code == 201
         data = response.json()
         assert data["count"] == 1
         assert len(data["todos"]) == 1
 
-    @pytest.mark.asyncio
     async def test_bulk_create_with_all_fields(self, test_client):
         """Test bulk create with all optional fields."""
-        response = await test_client.post(
-            "/todos/bulk",
-            json={
-                "todos": [
-                    {
-                        "description": "Full todo",
-                        "due_date_text": "tomorrow",
-                        "due_date": "2025-01-15",
-                        "notes": "Important notes",
-                        "priority": 1,
-                        "gcal_event_id": "gcal123",
-                    },
-                ]
-            },
-        )
+        payload = {
+            "description": "Full todo",
+            "due_date_text": "tomorrow",
+            "due_date": "2025-01-15",
+            "notes": "Important notes",
+            "priority": 1,
+            "gcal_event_id": "gcal123",
+        }
+        response = await test_client.post("/todos/bulk", json={"todos": [payload]})
         assert response.status_code == 201
         data = response.json()
-        todo = data["todos"][0]
-        assert todo["description"] == "Full todo"
-        assert todo["due_date_text"] == "tomorrow"
-        assert todo["due_date"] == "2025-01-15"
-        assert todo["notes"] == "Important notes"
-        assert todo["priority"] == 1
-        assert todo["gcal_event_id"] == "gcal123"
-
-    @pytest.mark.asyncio
-    async def test_bulk_create_empty_list_fails(self, test_client):
-        """Test that bulk create with empty list fails validation."""
-        response = await test_client.post(
-            "/todos/bulk",
-            json={"todos": []},
-        )
-        assert response.status_code == 422
-
-    @pytest.mark.asyncio
-    async def test_bulk_create_invalid_todo_fails(self, test_client):
-        """Test that bulk create fails if any TODO is invalid."""
-        response = await test_client.post(
-            "/todos/bulk",
-            json={
-                "todos": [
-                    {"description": "Valid todo"},
-                    {"description": ""},  # Invalid - empty description
-                ]
-            },
-        )
-        assert response.status_code == 422
-
-    @pytest.mark.asyncio
-    async def test_bulk_create_invalid_priority_fails(self, test_client):
-        """Test that bulk create fails with invalid priority."""
-        response = await test_client.post(
-            "/todos/bulk",
-            json={
-                "todos": [
-                    {"description": "Valid todo", "priority": 5},  # Invalid priority
-                ]
-            },
-        )
+        assert payload.items() <= data["todos"][0].items()
+
+    @pytest.mark.parametrize(
+        "body",
+        [
+            {"todos": []},  # empty list
+            {"todos": [{"description": "Valid todo"}, {"description": ""}]},  # one invalid TODO
+            {"todos": [{"description": "Valid todo", "priority": 5}]},  # invalid priority
+        ],
+    )
+    async def test_bulk_create_invalid_fails(self, test_client, body):
+        """Test that bulk create fails validation if the list is empty or any TODO is invalid."""
+        response = await test_client.post("/todos/bulk", json=body)
         assert response.status_code == 422
 
 
 class TestListTodos:
-    @pytest.mark.asyncio
     async def test_list_all_todos(self, test_client, sample_todo):
         """Test listing all TODOs."""
+        await sample_todo()
         response = await test_client.get("/todos")
         assert response.status_code == 200
         data = response.json()
@@ -188,49 +147,36 @@ class TestListTodos:
         assert "count" in data
         assert data["count"] >= 1
 
-    @pytest.mark.asyncio
     async def test_list_todos_filter_by_status(self, test_client, sample_todo):
         """Test filtering TODOs by status."""
+        await sample_todo()
+        pending, completed = await asyncio.gather(
+            test_client.get("/todos?status=pending"),
+            test_client.get("/todos?status=completed"),
+        )
+
         # List pending
-        response = await test_client.get("/todos?status=pending")
-        assert response.status_code == 200
-        data = response.json()
+        assert pending.status_code == 200
+        data = pending.json()
         for todo in data["todos"]:
             assert todo["status"] == "pending"
 
         # List completed (should be empty initially)
-        response = await test_client.get("/todos?status=completed")
-        assert response.status_code == 200
+        assert completed.status_code == 200
 
-    @pytest.mark.asyncio
     async def test_list_todos_filter_by_priority(self, test_client, sample_todo):
         """Test filtering TODOs by priority."""
+        await sample_todo()
         response = await test_client.get("/todos?priority=2")
         assert response.status_code == 200
         data = response.json()
         for todo in data["todos"]:
             assert todo["priority"] == 2
 
-    @pytest.mark.asyncio
     async def test_list_todos_sort_order(self, test_client):
         """Test that TODOs are sorted by due_date then priority."""
-        # Create TODOs with different dates and priorities
-        await test_client.post(
-            "/todos",
-            json={"description": "Later high", "due_date": "2025-01-20", "priority": 1},
-        )
-        await test_client.post(
-            "/todos",
-            json={"description": "Earlier low", "due_date": "2025-01-10", "priority": 4},
-        )
-        await test_client.post(
-            "/todos",
-            json={"description": "Same date low", "due_date": "2025-01-10", "priority": 3},
-        )
-        await test_client.post(
-            "/todos",
-            json={"description": "No date", "priority": 1},
-        )
+        # Create TODOs with different dates and priorities in one request
+        await test_client.post("/todos/bulk", content=_SORT_ORDER_PAYLOAD, headers=_JSON_HEADERS)
 
         response = await test_client.get("/todos")
         data = response.json()
@@ -246,50 +192,49 @@ class TestListTodos:
         assert test_todos[2]["description"] == "Later high"      # 01-20, priority 1
         assert test_todos[3]["description"] == "No date"         # NULL date comes last
 
+    async def test_list_todos_during_concurrent_writes(self, test_client):
+        """Test that reads interleaved with writes never hit a locked table."""
+        writes = [
+            test_client.post("/todos/bulk", content=_SINGLE_BULK_PAYLOAD, headers=_JSON_HEADERS)
+            for _ in range(50)
+        ]
+        reads = [test_client.get("/todos") for _ in range(50)]
+        responses = await asyncio.gather(*writes, *reads)
+
+        assert [r.status_code for r in responses[:50]] == [201] * 50
+        assert [r.status_code for r in responses[50:]] == [200] * 50
+
 
 class TestGetTodo:
-    @pytest.mark.asyncio
     async def test_get_single_todo(self, test_client, sample_todo):
         """Test getting a single TODO by ID."""
-        todo_id = sample_todo["id"]
+        sample = await sample_todo()
+        todo_id = sample["id"]
         response = await test_client.get(f"/todos/{todo_id}")
         assert response.status_code == 200
         data = response.json()
         assert data["id"] == todo_id
-        assert data["description"] == sample_todo["description"]
-
-    @pytest.mark.asyncio
-    async def test_get_nonexistent_todo_returns_404(self, test_client):
-        """Test that getting a non-existent TODO returns 404."""
-        response = await test_client.get("/todos/99999")
-        assert response.status_code == 404
-        assert response.json()["detail"] == "TODO not found"
+        assert data["description"] == sample["description"]
 
 
 class TestUpdateTodo:
-    @pytest.mark.asyncio
     async def test_update_todo(self, test_client, sample_todo):
         """Test updating a TODO."""
-        todo_id = sample_todo["id"]
-        response = await test_client.put(
-            f"/todos/{todo_id}",
-            json={
-                "description": "Updated description",
-                "priority": 1,
-                "notes": "Updated notes",
-            },
-        )
+        todo_id = (await sample_todo())["id"]
+        payload = {
+            "description": "Updated description",
+            "priority": 1,
+            "notes": "Updated notes",
+        }
+        response = await test_client.put(f"/todos/{todo_id}", json=payload)
         assert response.status_code == 200
-        data = response.json()
-        assert data["description"] == "Updated description"
-        assert data["priority"] == 1
-        assert data["notes"] == "Updated notes"
+        assert payload.items() <= response.json().items()
 
-    @pytest.mark.asyncio
     async def test_partial_update_todo(self, test_client, sample_todo):
         """Test partial update of a TODO."""
-        todo_id = sample_todo["id"]
-        original_description = sample_todo["description"]
+        sample = await sample_todo()
+        todo_id = sample["id"]
+        original_description = sample["description"]
 
         response = await test_client.put(
             f"/todos/{todo_id}",
@@ -300,69 +245,68 @@ class TestUpdateTodo:
         assert data["priority"] == 4
         assert data["description"] == original_description  # unchanged
 
-    @pytest.mark.asyncio
-    async def test_update_nonexistent_todo_returns_404(self, test_client):
-        """Test that updating a non-existent TODO returns 404."""
-        response = await test_client.put(
-            "/todos/99999",
-            json={"description": "Updated"},
-        )
-        assert response.status_code == 404
+
+    async def test_failed_update_releases_write_lock(
+        self, test_client, test_pool, test_db_path, sample_todo
+    ):
+        """Test that a write failing mid-transaction is rolled back, not left holding the lock."""
+        todo_id = (await sample_todo())["id"]
+        # NULL violates description's NOT NULL constraint after BEGIN IMMEDIATE
+        response = await test_client.put(f"/todos/{todo_id}", json={"description": None})
+        assert response.status_code == 500
+        assert not test_pool.writer.in_transaction
+
+        other = await connect_db(test_db_path, timeout=1)
+        try:
+            await other.execute("PRAGMA busy_timeout=0")
+            await other.execute("BEGIN IMMEDIATE")
+            await other.rollback()
+        finally:
+            await other.close()
 
 
 class TestDeleteTodo:
-    @pytest.mark.asyncio
     async def test_delete_todo(self, test_client, sample_todo):
         """Test soft deleting a TODO."""
-        todo_id = sample_todo["id"]
+        todo_id = (await sample_todo())["id"]
         response = await test_client.delete(f"/todos/{todo_id}")
         assert response.status_code == 200
         data = response.json()
         assert data["message"] == "TODO deleted"
         assert data["id"] == todo_id
 
-    @pytest.mark.asyncio
     async def test_deleted_todo_not_in_list(self, test_client, sample_todo):
         """Test that deleted TODO is not returned in list."""
-        todo_id = sample_todo["id"]
+        todo_id = (await sample_todo())["id"]
         await test_client.delete(f"/todos/{todo_id}")
 
-        response = await test_client.get("/todos")
+        # The sample TODO is pending, so the pending filter is enough to find it
+        response = await test_client.get("/todos?status=pending")
         data = response.json()
-        todo_ids = [t["id"] for t in data["todos"]]
-        assert todo_id not in todo_ids
+        assert todo_id not in {t["id"] for t in data["todos"]}
 
-    @pytest.mark.asyncio
     async def test_deleted_todo_returns_404_on_get(self, test_client, sample_todo):
         """Test that getting a deleted TODO returns 404."""
-        todo_id = sample_todo["id"]
+        todo_id = (await sample_todo())["id"]
         await test_client.delete(f"/todos/{todo_id}")
 
         response = await test_client.get(f"/todos/{todo_id}")
         assert response.status_code == 404
 
-    @pytest.mark.asyncio
-    async def test_delete_nonexistent_todo_returns_404(self, test_client):
-        """Test that deleting a non-existent TODO returns 404."""
-        response = await test_client.delete("/todos/99999")
-        assert response.status_code == 404
-
 
 class TestCompleteTodo:
-    @pytest.mark.asyncio
     async def test_complete_todo(self, test_client, sample_todo):
         """Test completing a TODO."""
-        todo_id = sample_todo["id"]
+        todo_id = (await sample_todo())["id"]
         response = await test_client.post(f"/todos/{todo_id}/complete")
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "completed"
         assert data["completed_at"] is not None
 
-    @pytest.mark.asyncio
     async def test_complete_already_completed_todo(self, test_client, sample_todo):
         """Test completing an already completed TODO (idempotent)."""
-        todo_id = sample_todo["id"]
+        todo_id = (await sample_todo())["id"]
         await test_client.post(f"/todos/{todo_id}/complete")
 
         response = await test_client.post(f"/todos/{todo_id}/complete")
@@ -370,27 +314,19 @@ class TestCompleteTodo:
         data = response.json()
         assert data["status"] == "completed"
 
-    @pytest.mark.asyncio
     async def test_complete_deleted_todo_returns_404(self, test_client, sample_todo):
         """Test that completing a deleted TODO returns 404."""
-        todo_id = sample_todo["id"]
+        todo_id = (await sample_todo())["id"]
         await test_client.delete(f"/todos/{todo_id}")
 
         response = await test_client.post(f"/todos/{todo_id}/complete")
         assert response.status_code == 404
 
-    @pytest.mark.asyncio
-    async def test_complete_nonexistent_todo_returns_404(self, test_client):
-        """Test that completing a non-existent TODO returns 404."""
-        response = await test_client.post("/todos/99999/complete")
-        assert response.status_code == 404
-
 
 class TestReopenTodo:
-    @pytest.mark.asyncio
     async def test_reopen_todo(self, test_client, sample_todo):
         """Test reopening a completed TODO."""
-        todo_id = sample_todo["id"]
+        todo_id = (await sample_todo())["id"]
         await test_client.post(f"/todos/{todo_id}/complete")
 
         response = await test_client.post(f"/todos/{todo_id}/reopen")
@@ -399,50 +335,52 @@ class TestReopenTodo:
         assert data["status"] == "pending"
         assert data["completed_at"] is None
 
-    @pytest.mark.asyncio
     async def test_reopen_already_pending_todo(self, test_client, sample_todo):
         """Test reopening an already pending TODO (idempotent)."""
-        todo_id = sample_todo["id"]
+        todo_id = (await sample_todo())["id"]
         response = await test_client.post(f"/todos/{todo_id}/reopen")
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "pending"
 
-    @pytest.mark.asyncio
-    async def test_reopen_nonexistent_todo_returns_404(self, test_client):
-        """Test that reopening a non-existent TODO returns 404."""
-        response = await test_client.post("/todos/99999/reopen")
+
+class TestNonexistentTodo:
+    @pytest.mark.parametrize(
+        "method,path",
+        [
+            ("GET", "/todos/99999"),
+            ("PUT", "/todos/99999"),
+            ("DELETE", "/todos/99999"),
+            ("POST", "/todos/99999/complete"),
+            ("POST", "/todos/99999/reopen"),
+        ],
+    )
+    async def test_nonexistent_todo_returns_404(self, test_client, method, path):
+        """Test that every single-TODO endpoint returns 404 for a missing ID."""
+        json = {"description": "Updated"} if method == "PUT" else None
+        response = await test_client.request(method, path, json=json)
         assert response.status_code == 404
+        assert response.json()["detail"] == "TODO not found"
 
 
 class TestPurgeTodos:
-    @pytest.mark.asyncio
-    async def test_purge_deleted_todos(self, test_client, sample_todo):
-        """Test purging soft-deleted TODOs."""
-        todo_id = sample_todo["id"]
-        await test_client.delete(f"/todos/{todo_id}")
-
+    async def test_purge_lifecycle(self, test_client, sample_todo):
+        """Test purge with nothing deleted, then purging a deleted TODO beside an active one."""
+        # Nothing deleted yet
         response = await test_client.delete("/admin/purge")
         assert response.status_code == 200
-        data = response.json()
-        assert data["message"] == "Purged deleted TODOs"
-        assert data["count"] >= 1
+        assert response.json()["count"] == 0
 
-    @pytest.mark.asyncio
-    async def test_purge_does_not_affect_active_todos(self, test_client, sample_todo):
-        """Test that purge does not affect active TODOs."""
-        todo_id = sample_todo["id"]
+        active_id = (await sample_todo(description="Active"))["id"]
+        deleted_id = (await sample_todo(description="Deleted"))["id"]
+        await test_client.delete(f"/todos/{deleted_id}")
 
         response = await test_client.delete("/admin/purge")
         assert response.status_code == 200
+        data = response.json()
+        assert data["message"] == "Purged deleted TODOs"
+        assert data["count"] == 1
 
         # Active TODO should still exist
-        response = await test_client.get(f"/todos/{todo_id}")
-        assert response.status_code == 200
-
-    @pytest.mark.asyncio
-    async def test_purge_returns_zero_when_no_deleted(self, test_client):
-        """Test purge returns zero count when no deleted TODOs."""
-        response = await test_client.delete("/admin/purge")
+        response = await test_client.get(f"/todos/{active_id}")
         assert response.status_code == 200
-        # Count could be 0 or more depending on previous tests